@@ -45,3 +45,11 @@ class CommandLLMCache:
         key = self._get_key(command_input_or_output)
         self.cache[key] = value
         self._save_cache()
+
+    def set_many(self, items):
+        """
+        Stores several (command_input_or_output, value) results, saving the cache file once.
+        """
+        for command_input_or_output, value in items:
+            self.cache[self._get_key(command_input_or_output)] = value
+        self._save_cache()
@@ -1,7 +1,9 @@
 import os
 import json
+import orjson
 from typing import Dict, Any, List
 from config import LLM_CACHE_PATH
+from utils.utils import clone_state
 
 
 class LLMCache:
@@ -11,22 +13,51 @@ class LLMCache:
 
     def __init__(self, cache_file: str = LLM_CACHE_PATH):
         self.cache_file = cache_file
-        self.cache = self._load_cache()
+        self._file_signature = None
+        self.cache = []
+        self._index = {}
+        self._refresh()
 
     def _load_cache(self) -> List[Dict[str, Any]]:
         if os.path.exists(self.cache_file):
-            with open(self.cache_file, "r", encoding="utf-8") as f:
+            with open(self.cache_file, "rb") as f:
                 try:
-                    return json.load(f)
-                except json.JSONDecodeError:
+                    return orjson.loads(f.read())
+                except orjson.JSONDecodeError:
                     print("[!] Cache file is corrupted. Starting fresh.")
                     return []
         return []
 
     def _save_cache(self) -> None:
         os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        with open(self.cache_file, "w", encoding="utf-8") as f:
-            json.dump(self.cache, f, indent=2, ensure_ascii=False)
+        with open(self.cache_file, "wb") as f:
+            f.write(orjson.dumps(self.cache, option=orjson.OPT_INDENT_2))
+        self._file_signature = self._stat_signature()
+
+    def _stat_signature(self):
+        """
+        (mtime, size) of the cache file, or None if it does not exist.
+        """
+        try:
+            st = os.stat(self.cache_file)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self) -> None:
+        """
+        Reloads the cache from disk only if the file changed since it was last loaded or saved,
+        and rebuilds the action -> entry index.
+        """
+        signature = self._stat_signature()
+        if signature is not None and signature == self._file_signature:
+            return
+
+        self.cache = self._load_cache()
+        self._index = {}
+        for entry in self.cache:
+            self._index.setdefault(entry["action"], entry)
+        self._file_signature = signature
 
     def _split_key(self, key: str) -> (str, List[str]):
         parts = key.split("::")
@@ -34,38 +65,53 @@ class LLMCache:
 
     def get(self, key: str) -> Any:
         """
-        תמיד טוען מחדש את הקובץ מהדיסק, כדי לוודא שהמידע מעודכן.
+        טוען מחדש את הקובץ מהדיסק אם הוא השתנה, כדי לוודא שהמידע מעודכן.
         תומך במפתחות מקוננים: action::category1::category2::...
         """
-        self.cache = self._load_cache()  # קריאה תמידית מהקובץ
-
         base_action, path = self._split_key(key)
-        for entry in self.cache:
-            if entry["action"] == base_action:
-                node = entry.get("categories", {})
-                for part in path:
-                    if isinstance(node, dict) and part in node:
-                        node = node[part]
-                    else:
-                        return None
-                return node
-        return None
+        return self.get_path(base_action, path)
+
+    def get_path(self, action: str, path) -> Any:
+        """
+        Same as get(f"{action}::{'::'.join(path)}"), with the category path already split
+        (lets callers probe many categories without building and splitting a key for each).
+        """
+        self._refresh()  # טוען מחדש רק אם הקובץ השתנה
+
+        entry = self._index.get(action)
+        if entry is None:
+            return None
+
+        node = entry.get("categories", {})
+        for part in path:
+            if isinstance(node, dict) and part in node:
+                node = node[part]
+            else:
+                return None
+        # Callers get their own copy, so they cannot mutate the in-memory cache
+        return clone_state(node)
 
     def set(self, key: str, value: Any) -> None:
         base_action, path = self._split_key(key)
+        self.set_path(base_action, path, value)
+
+    def set_path(self, action: str, path, value: Any) -> None:
+        """
+        Same as set(f"{action}::{'::'.join(path)}", value), with the category path already split.
+        """
         if not path:
             print("[!] Cannot set cache without at least one category (use action::category)")
             return
 
         # חפש או צור entry לפי base_action
-        for entry in self.cache:
-            if entry["action"] == base_action:
-                node = entry.setdefault("categories", {})
-                for part in path[:-1]:
-                    node = node.setdefault(part, {})
-                node[path[-1]] = value
-                self._save_cache()
-                return
+        entry = self._index.get(action)
+        if entry is not None:
+            node = entry.setdefault("categories", {})
+            for part in path[:-1]:
+                node = node.setdefault(part, {})
+            node[path[-1]] = value
+            self._save_cache()
+            return
 
         # אם אין כניסה בכלל לאקשן
         node = {}
@@ -75,10 +121,12 @@ class LLMCache:
             current = current[part]
         current[path[-1]] = value
 
-        self.cache.append({
-            "action": base_action,
+        entry = {
+            "action": action,
             "categories": node
-        })
+        }
+        self.cache.append(entry)
+        self._index[action] = entry
         self._save_cache()
 
     def debug_print(self):
@@ -1,27 +1,36 @@
-import random
-import subprocess
-import json
+import orjson
 import torch
-import os
-import sys
+import functools
+import hashlib
+import re
+import logging
 import numpy as np
+from concurrent.futures import Future
 from abc import ABC, abstractmethod
 from typing import Any, List
-from time import sleep
-from config import DEFAULT_STATE_STRUCTURE
+from collections import OrderedDict
+from config import DEFAULT_STATE_STRUCTURE, OUTPUT_LLM_CACHE_PATH
 
 from blackboard.blackboard import initialize_blackboard
 
 from Cache.llm_cache import LLMCache
 from Cache.commandLLM_cache import CommandLLMCache
 
-from utils.prompts import PROMPT, PROMPT_FOR_A_PROMPT
-from utils.utils import remove_comments_and_empty_lines
+from utils.prompts import PROMPT, PROMPT_FOR_A_PROMPT, clean_output_prompt
+from utils.utils import remove_comments_and_empty_lines_bytes, clone_state, freeze
 from utils.state_check.state_validator import validate_state
 from utils.state_check.state_correctness import correct_state, clean_state, merge_state
 from utils.state_check.state_sorting import sort_state
 from utils.json_fixer import fix_json
-from tools.run_manual import run_clean_output
+from tools.run_manual import run_output_bytes
+
+logger = logging.getLogger(__name__)
+
+# Marks a missing entry in caches where None / "" are valid cached values
+_SENTINEL = object()
+
+# Max number of action -> (output, parsed categories) entries in each agent's plan cache
+_PLAN_CACHE_SIZE = 100
 
 def remove_untrained_categories(state: dict, trained_categories: dict):
 
@@ -37,12 +46,121 @@ def remove_untrained_categories(state: dict, trained_categories: dict):
             for inner_key in inner_keys_to_remove:
                 state[key].pop(inner_key, None)
 
+def extract_paths(d: Any, prefix: str = "", include_brackets: bool = False) -> list[str]:
+    """
+    Extracts paths from a nested dictionary structure.
+
+    - Lists are treated as leaf nodes — no recursion into list elements.
+    - If include_brackets=True, list fields will be marked with '[]' (e.g., 'services[]').
+    - All paths use '::' as separator.
+
+    Args:
+        d (Any): The input structure (typically a nested dict).
+        prefix (str): The path prefix used during recursion.
+        include_brackets (bool): Whether to append '[]' for lists.
+
+    Returns:
+        list[str]: List of paths as strings.
+    """
+    paths = []
+
+    if isinstance(d, dict):
+        for key, val in d.items():
+            current_path = f"{prefix}::{key}" if prefix else key
+            if isinstance(val, list):
+                # Treat list as a leaf
+                list_path = current_path + "[]" if include_brackets else current_path
+                paths.append(list_path)
+            else:
+                paths.extend(extract_paths(val, current_path, include_brackets))
+
+    elif isinstance(d, set):
+        fake_dict = {key: None for key in d}
+        paths.extend(extract_paths(fake_dict, prefix, include_brackets))
+
+    else:
+        paths.append(prefix)
+
+    return paths
+
+# The state structure never changes at runtime, so its category paths (and their dotted
+# form used in the prompts) are computed once
+_CATEGORY_PATHS = tuple(extract_paths(DEFAULT_STATE_STRUCTURE))
+_CATEGORY_PATHS_DOTTED = tuple(p.replace("::", ".") for p in _CATEGORY_PATHS)
+_CATEGORY_PARTS = tuple(tuple(p.split("::")) for p in _CATEGORY_PATHS)
+
+# Category paths split into (parent keys, leaf key), the merge plan of update_state_with_categories
+_MERGE_PLAN = tuple((tuple(parts[:-1]), parts[-1]) for parts in (p.split("::") for p in _CATEGORY_PATHS))
+
+def _merge_category_value(state_node: dict, key: str, cat_val):
+    """
+    Merges a single category value into state_node[key] (see update_state_with_categories).
+    """
+    state_val = state_node[key]
+
+    if isinstance(cat_val, dict):
+        _merge_category_tree(state_val, cat_val)
+
+    elif isinstance(cat_val, list) and isinstance(state_val, list):
+        # רק מוסיף פריטים חדשים לרשימה מבלי למחוק קיימים (set lookup instead of a list scan per item)
+        seen = {freeze(item) for item in state_val}
+        for item in cat_val:
+            key = freeze(item)
+            if key not in seen:
+                seen.add(key)
+                state_val.append(item)
+
+    elif cat_val != "NO":
+        # עדכן רק אם הערך הנוכחי ב־state ריק ("" או None)
+        if state_val in ["", None]:
+            state_node[key] = cat_val
+
+def _merge_category_tree(state_node, category_node):
+    """
+    Generic recursive merge, for category values nested deeper than the state structure.
+    """
+    if isinstance(category_node, dict) and isinstance(state_node, dict):
+        for key, cat_val in category_node.items():
+            if key in state_node:  # התעלם ממפתחות שלא קיימים ב־state
+                _merge_category_value(state_node, key, cat_val)
+
+# Model answer between the llama-run escape markers; an answer without the end marker runs to the end
+_RESP_RE = re.compile(r"Loading model\n\x1b\[K\n\x1b\[33m(.*?)(\x1b\[0m\n\x1b\[0m\n|\Z)", re.DOTALL)
+
+def extract_model_response(raw: str) -> str:
+    """
+    מחלץ את הפלט האמיתי של המודל לפי תבנית escape קבועה,
+    ע"י זיהוי התחלה: 'Loading model\\n\\u001b[K\\n\\u001b[33m'
+    וסיום: '\\u001b[0m\\n\\u001b[0m\\n'
+    """
+    match = _RESP_RE.search(raw)
+    if match is None:
+       # print("[!] Start marker not found.")
+        return ""
+
+    if not match.group(2):
+        print("[!] End marker not found.")
+
+    return match.group(1).strip()
+
+@functools.lru_cache(maxsize=1)
+def _blackboard_template() -> dict:
+    """
+    An empty blackboard, built once and shared. Used only as a read-only structure template.
+    """
+    return initialize_blackboard()
+
 def is_valid_json(s: str) -> bool:
+    return parse_json(s) is not _SENTINEL
+
+def parse_json(s: str):
+    """
+    Parses s with orjson. Returns _SENTINEL (not None, which is valid JSON) if s is not valid JSON.
+    """
     try:
-        json.loads(s)
-        return True
-    except (json.JSONDecodeError, TypeError):
-        return False
+        return orjson.loads(s)
+    except (orjson.JSONDecodeError, TypeError):
+        return _SENTINEL
 
 
 class BaseAgent(ABC):
@@ -52,7 +170,7 @@ class BaseAgent(ABC):
     """
 
     def __init__(self, name, action_space, blackboard_api, replay_buffer,
-                 policy_model, state_encoder, action_encoder, command_cache, model, epsilon, os_linux_dataset, os_linux_kernel_dataset, min_epsilon = 0.01, epsilon_decay = 0.995):
+                 policy_model, state_encoder, action_encoder, command_cache, model, epsilon, os_linux_dataset, os_linux_kernel_dataset, min_epsilon = 0.01, epsilon_decay = 0.995, update_batch_size = 1):
         self.name = name
         self.action_space = action_space
         self.blackboard_api = blackboard_api
@@ -60,22 +178,49 @@ class BaseAgent(ABC):
         self.policy_model = policy_model
         self.state_encoder = state_encoder
         self.action_encoder = action_encoder
-        self.command_cache = command_cache
+        self.command_cache: dict[str, str] = command_cache
         self.model = model
         self.epsilon = epsilon
         self.min_epsilon = min_epsilon
         self.epsilon_decay = epsilon_decay
         self.actions_history = []
+        # Per-action counts of actions_history, kept in step with it for the state encoder
+        self._action_index = {a: i for i, a in enumerate(action_space)}
+        self._action_counts = np.zeros(len(action_space), dtype=np.float32)
         self.last_state = None
         self.encoded_last_state = None
         self.last_action = None
         self.llm_cache = LLMCache()
         self.command_llm_cache = CommandLLMCache()
+        self.output_llm_cache = CommandLLMCache(OUTPUT_LLM_CACHE_PATH)
         self.episode_total_reward = 0.0
+        self.update_batch_size = update_batch_size
+        self._pending_experiences = []
+        # action -> (command output, parsed categories), LRU ordered.
+        # Only valid for the blackboard it was filled on (same run and target), see act()
+        self._plan_cache = OrderedDict()
+        self._plan_blackboard = None
+        # (blackboard version, raw state, encoded state) of the last next_state, reused by observe()
+        self._next_state_cache = None
         self.os_linux_dataset=os_linux_dataset,
         self.os_linux_kernel_dataset=os_linux_kernel_dataset
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")  # <-- חדש
+
+        # Pre-rolled exploration draws for choose_action, refilled in chunks
+        self._rng = np.random.default_rng()
+        self._explore_rolls = None
+        self._explore_actions = None
+        self._explore_buf_idx = 0
+
+        # Reusable (1, state_dim) input buffers for choose_action, allocated on first use
+        self._host_state = None
+        self._dev_state = None
+
+        # CUDA graph of the policy forward pass on _dev_state, captured on first use
+        self._q_graph = None
+        self._q_out = None
+        self._q_graph_failed = False
  
     @abstractmethod
     def should_run(self) -> bool:
@@ -95,85 +240,122 @@ class BaseAgent(ABC):
         """
         Main loop of the agent: observe, choose action, perform, parse, learn, update.
         """
-        #step 1: fill state with all categories
+        encoded_state = self.observe()
+
+        # Step 2: select action
+        action = self.choose_action(encoded_state)
+        self.act(action)
+
+    def observe(self) -> torch.Tensor:
+        """
+        First half of run(): prepare the blackboard and encode the current state.
+        The raw and encoded states are kept in last_state / encoded_last_state for act().
+        """
+        #step 1: fill state with all categories (fill_state stores its own copy of the history)
         self.blackboard_api.fill_state(
-            actions_history=self.actions_history.copy(),
+            actions_history=self.actions_history,
             )
-        # Step 1: get state
-        state = dict(self.get_state_raw())
-        encoded_state = self.state_encoder.encode(state, self.actions_history)
+        # Step 1: get state - reuse the next state encoded by the last act() if the blackboard didn't change since
+        cached = self._next_state_cache
+        if cached is not None and cached[0] == self.blackboard_api.version:
+            _, state, encoded_state = cached
+            state = {**state, "actions_history": list(self.actions_history)}
+        else:
+            state = self.get_state_raw()
+            encoded_state = self.state_encoder.encode(state, self.actions_history, action_counts=self._action_counts)
         self.last_state = state
         self.encoded_last_state = encoded_state
 
         # [DEBUG]
-        #print(f"last state: {json.dumps(state, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("last state: %s", orjson.dumps(state, option=orjson.OPT_INDENT_2).decode())
 
-        # Step 2: select action
-        action = self.choose_action(encoded_state)
-        self.last_action = action
+        return encoded_state
 
-        #print(f"\n[+] Agent: {self.name}")
-        #print(f"    Current state: {str(state)[:8]}...")
-        print(f"    Chosen action: {action}")
+    def act(self, action: str):
+        """
+        Second half of run(): perform the chosen action, update the blackboard and learn from it.
+        Must follow observe().
+        """
+        state = self.last_state
+        encoded_state = self.encoded_last_state
+        self.last_action = action
 
-        # Step 3: execute action
-        result = remove_comments_and_empty_lines(self.perform_action(action)) # TODO: Improving remove_comments_and_empty_lines
-        #print("\033[1;32m" + str(result) + "\033[0m")
+        logger.info("    Chosen action: %s", action)
+
+        # Steps 3-5 are skipped when this action was already executed and parsed:
+        # both the command output and the LLM answers for it are cached anyway
+        blackboard = self.blackboard_api.blackboard
+        if blackboard is not self._plan_blackboard:
+            # A new blackboard means a new run (possibly another target or host state)
+            self._plan_cache.clear()
+            self._plan_blackboard = blackboard
+        plan = self._plan_cache.get(action)
+        if plan is not None:
+            self._plan_cache.move_to_end(action)
+            result, parsed_categories = plan
+        else:
+            # Step 3: execute action
+            result = self.perform_action(action)
+            logger.debug("output: %s", result)
 
-        # Step 4: clean output (if long)
-        """
-        if len(result.split()) > 300:
-            try:
-                cleaned_output = self.clean_output(clean_output_prompt(result))
-            except Exception as e:
-                print(f"[!] Failed to clean output: {e}")
+            # Step 4: clean output (if long)
+            """
+            if len(result.split()) > 300:
+                try:
+                    cleaned_output = self.clean_output(result).result()
+                except Exception as e:
+                    print(f"[!] Failed to clean output: {e}")
+                    cleaned_output = result
+            else:
                 cleaned_output = result
-        else:
-            cleaned_output = result
-        print(f"\033[94mcleaned_output - {cleaned_output}\033[0m")
-        """
+            print(f"\033[94mcleaned_output - {cleaned_output}\033[0m")
+            """
 
-        # Step 5: parse, validate and update blackboard
-        self.parse_output(result)
-        #print(f"parsed_info - {parsed_info}")
+            # Step 5: parse, validate and update blackboard
+            self.parse_output(result)
+            #print(f"parsed_info - {parsed_info}")
 
-        #sleep(1)
+            parsed_categories = self.llm_cache.get(action)
+            self._plan_cache[action] = (result, parsed_categories)
+            if len(self._plan_cache) > _PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
 
-        new_info = self.llm_cache.get(action)
-        new_info = self.update_state_with_categories(self.last_state, new_info)
-        #print(f"new_info - {new_info}")
+        new_info = self.update_state_with_categories(self.last_state, clone_state(parsed_categories))
+        logger.debug("new_info: %s", new_info)
         self.check_state(new_info)
         #print(f"after - {new_info}")
 
         self.blackboard_api.update_state(self.name, new_info)
 
         # Step 6: observe next state
-        next_state = dict(self.get_state_raw())
-        encoded_next_state = self.state_encoder.encode(next_state, self.actions_history)
+        next_state = self.get_state_raw()
 
         # Step 7: reward and update model
         reward = self.get_reward(state, action, next_state, new_info)
         self.episode_total_reward += reward
-        #print(f"new state: {json.dumps(dict(self.state_encoder.decode(encoded_next_state)), indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("new state: %s", orjson.dumps(next_state, option=orjson.OPT_INDENT_2).decode())
 
+        action_index = self._action_index[action]
         self.actions_history.append(action)
+        self._action_counts[action_index] += 1
+
+        # Encoded with the updated history, so it is exactly the state the next observe() would encode
+        encoded_next_state = self.state_encoder.encode(next_state, self.actions_history, action_counts=self._action_counts)
+        self._next_state_cache = (self.blackboard_api.version, next_state, encoded_next_state)
 
         experience = {
             "state": encoded_state,
-            "action": self.action_space.index(action),
+            "action": action_index,
             "reward": reward,
             "next_state": encoded_next_state
         }
 
-        q_pred, loss = self.policy_model.update(experience)
-
-        #print(f"    Predicted Q-value: {q_pred:.4f}")
-        #print(f"    Actual reward:     {reward:.4f}")
-        #print(f"    Loss:              {loss:.6f}")
-
-        # Step 8: save experience
-        if self.replay_buffer is not None:
-            self.replay_buffer.add_experience(encoded_state, self.action_space.index(action), reward, encoded_next_state, False)
+        # Step 8: update model and save experience (every `update_batch_size` steps)
+        self._pending_experiences.append(experience)
+        if len(self._pending_experiences) >= self.update_batch_size:
+            self.flush_experiences()
 
         # Step 9: log action
         self.blackboard_api.append_action_log({
@@ -182,37 +364,123 @@ class BaseAgent(ABC):
             "result": result,
         })
 
+    def flush_experiences(self):
+        """
+        Apply all pending experiences: one policy update for the whole batch,
+        then store them in the replay buffer.
+        """
+        if not self._pending_experiences:
+            return
+
+        q_pred, loss = self.policy_model.update_batch(self._pending_experiences)
+
+        #print(f"    Predicted Q-value: {q_pred:.4f}")
+        #print(f"    Loss:              {loss:.6f}")
+
+        if self.replay_buffer is not None:
+            self.replay_buffer.add_batch(self._pending_experiences)
+
+        self._pending_experiences = []
+
     def choose_action(self, state_vector):
         """
         ε-greedy policy: choose random action with probability ε, else best predicted action.
-        Also prints all predicted Q-values for analysis.
+        The Q-values are only computed when exploiting.
         """
-        # הפוך את state_vector ל־Tensor אם צריך
-        if not isinstance(state_vector, torch.Tensor):
-            state_tensor = torch.tensor(state_vector, dtype=torch.float32).unsqueeze(0)
-        else:
-            state_tensor = state_vector.unsqueeze(0) if state_vector.ndim == 1 else state_vector
+        # בחירת פעולה - exploration is decided first, so exploring steps skip the forward pass
+        random_index = self._exploration_index()
+        if random_index is not None:
+            return self.action_space[random_index]
 
-        state_tensor = state_tensor.to(next(self.policy_model.parameters()).device)
+        state_tensor = self._stage_state(state_vector, next(self.policy_model.parameters()).device)
 
-        # חיזוי Q-values
+        # חיזוי Q-values; the argmax runs on the model's device and only the chosen index is copied back
         with torch.no_grad():
-            q_values = self.policy_model.forward(state_tensor).cpu().numpy().flatten()
+            action_index = int(self._forward_q(state_tensor).argmax())
 
-        # הדפסה של כל הערכים
-        #print("\n[✓] Q-value predictions:")
-        #for action, q in zip(self.action_space, q_values):
-            #print(f"  {action:70s} => Q = {q:.4f}")
+        return self.action_space[action_index]
 
-        # בחירת פעולה
-        rnd = random.random() 
+    def _exploration_index(self):
+        """
+        ε-greedy coin flip: a random action index when exploring, None when the policy should choose.
+        """
+        rnd, random_index = self._next_exploration_draw()
         if rnd < self.epsilon:
             #print(f"\033[91m[! EXPLORATION] rnd={rnd:.4f} < ε={self.epsilon:.4f} → Choosing random action\033[0m")
-            action_index = random.randint(0, len(self.action_space) - 1)
+            return random_index
+        return None
+
+    def _stage_state(self, state_vector, device: torch.device) -> torch.Tensor:
+        """
+        Copy a state vector into the reusable (1, state_dim) model input buffer on `device`.
+        On CUDA the host side is pinned, so the upload is a non-blocking copy.
+        """
+        # הפוך את state_vector ל־Tensor אם צריך
+        if isinstance(state_vector, torch.Tensor):
+            flat = state_vector.detach().reshape(-1)
         else:
-            action_index = int(np.argmax(q_values))
+            flat = torch.from_numpy(np.asarray(state_vector, dtype=np.float32).reshape(-1))
+
+        if self._dev_state is None or self._dev_state.device != device or self._dev_state.shape[1] != flat.numel():
+            pin = device.type == "cuda"
+            self._host_state = torch.empty((1, flat.numel()), dtype=torch.float32, pin_memory=pin)
+            self._dev_state = torch.empty_like(self._host_state, device=device) if pin else self._host_state
+            # A captured graph reads the old buffer
+            self._q_graph = None
+            self._q_out = None
+
+        self._host_state[0].copy_(flat)
+        if self._dev_state is not self._host_state:
+            self._dev_state.copy_(self._host_state, non_blocking=True)
+        return self._dev_state
+
+    def _forward_q(self, state_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Policy forward pass on the staged input buffer (call under torch.no_grad()).
+        On CUDA the pass is captured once into a CUDA graph and replayed, so each step is
+        a single launch; the weights are updated in place, so replays see the latest ones.
+        Falls back to eager mode on CPU or if the capture fails.
+        """
+        if state_tensor.device.type != "cuda" or self._q_graph_failed:
+            return self.policy_model.forward(state_tensor)
 
-        return self.action_space[action_index]
+        if self._q_graph is None:
+            try:
+                # Warm up on a side stream before capturing, as required by torch.cuda.graph
+                side_stream = torch.cuda.Stream()
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    for _ in range(3):
+                        self.policy_model.forward(state_tensor)
+                torch.cuda.current_stream().wait_stream(side_stream)
+
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph):
+                    self._q_out = self.policy_model.forward(state_tensor)
+                self._q_graph = graph
+            except Exception as e:
+                logger.warning("CUDA graph capture failed, using eager forward: %s", e)
+                self._q_graph_failed = True
+                self._q_out = None
+                return self.policy_model.forward(state_tensor)
+
+        self._q_graph.replay()
+        return self._q_out
+
+    def _next_exploration_draw(self, chunk_size: int = 1024):
+        """
+        Returns the next (uniform roll, random action index) pair.
+        Draws are generated in chunks with NumPy instead of two Python RNG calls per step.
+        The roll is compared to the current epsilon by the caller, so epsilon decay still applies.
+        """
+        if self._explore_rolls is None or self._explore_buf_idx >= chunk_size:
+            self._explore_rolls = self._rng.random(chunk_size)
+            self._explore_actions = self._rng.integers(0, len(self.action_space), chunk_size)
+            self._explore_buf_idx = 0
+
+        i = self._explore_buf_idx
+        self._explore_buf_idx += 1
+        return float(self._explore_rolls[i]), int(self._explore_actions[i])
 
     def decay_epsilon(self):
         """
@@ -230,22 +498,24 @@ class BaseAgent(ABC):
         """
         Encoded state vector.
         """
-        return self.state_encoder.encode(self.get_state_raw(), self.actions_history)
+        return self.state_encoder.encode(self.get_state_raw(), self.actions_history, action_counts=self._action_counts)
 
     def perform_action(self, action: str) -> str:
         """
         Default behavior: run an IP-based shell command with the action template.
+        Returns the output without comment / empty lines.
         """
+        cached = self.command_cache.get(action, _SENTINEL)
+        if cached is not _SENTINEL:
+            #print(f"[Cache] Returning cached result for action: {action}")
+            return cached
+
         ip = self.blackboard_api.blackboard.get("target", {}).get("ip", "127.0.0.1")
         command = action.format(ip=ip)
 
-        if action in self.command_cache:
-            #print(f"[Cache] Returning cached result for action: {action}")
-            return self.command_cache[action]
-        
         try:
             #output = subprocess.check_output(command.split(), timeout=10).decode()
-            output = run_clean_output(command, timeout=60*5)
+            output = remove_comments_and_empty_lines_bytes(run_output_bytes(command, timeout=60*5))
             #print(f"output: {output}")
         except Exception as e:
             self.blackboard_api.add_error(self.name, action, str(e))
@@ -260,104 +530,60 @@ class BaseAgent(ABC):
         gets its own prompt. Caching is done per action::category_path.
         """
 
-        trained_categories = {
-            "target": {
-                "hostname", "netbios_name", "os", "services", "rpc_services", "dns_records",
-                "network_interfaces", "geo_location", "ssl", "http", "trust_relationships",
-                "users", "groups"
-            },
-            "web_directories_status": None
-        }
-
-        def extract_paths(d: Any, prefix: str = "", include_brackets: bool = False) -> list[str]:
-            """
-            Extracts paths from a nested dictionary structure.
-            
-            - Lists are treated as leaf nodes — no recursion into list elements.
-            - If include_brackets=True, list fields will be marked with '[]' (e.g., 'services[]').
-            - All paths use '::' as separator.
-
-            Args:
-                d (Any): The input structure (typically a nested dict).
-                prefix (str): The path prefix used during recursion.
-                include_brackets (bool): Whether to append '[]' for lists.
-
-            Returns:
-                list[str]: List of paths as strings.
-            """
-            paths = []
-
-            if isinstance(d, dict):
-                for key, val in d.items():
-                    current_path = f"{prefix}::{key}" if prefix else key
-                    if isinstance(val, list):
-                        # Treat list as a leaf
-                        list_path = current_path + "[]" if include_brackets else current_path
-                        paths.append(list_path)
-                    else:
-                        paths.extend(extract_paths(val, current_path, include_brackets))
-
-            elif isinstance(d, set):
-                fake_dict = {key: None for key in d}
-                paths.extend(extract_paths(fake_dict, prefix, include_brackets))
-
-            else:
-                paths.append(prefix)
-
-            return paths
-
-        def extract_model_response(raw: str) -> str:
-            """
-            מחלץ את הפלט האמיתי של המודל לפי תבנית escape קבועה,
-            ע"י זיהוי התחלה: 'Loading model\\n\\u001b[K\\n\\u001b[33m'
-            וסיום: '\\u001b[0m\\n\\u001b[0m\\n'
-            """
-            start_marker = "Loading model\n\u001b[K\n\u001b[33m"
-            end_marker = "\u001b[0m\n\u001b[0m\n"
-
-            start_index = raw.find(start_marker)
-            if start_index == -1:
-               # print("[!] Start marker not found.")
-                return ""
-
-            # המיקום שבו מתחילה התשובה
-            answer_start = start_index + len(start_marker)
-
-            end_index = raw.find(end_marker, answer_start)
-            if end_index == -1:
-                print("[!] End marker not found.")
-                return raw[answer_start:].strip()
+        category_paths = _CATEGORY_PATHS
+        full_responses = {}
 
-            # חותכים בדיוק בין ההתחלה לסיום
-            return raw[answer_start:end_index].strip()
+        # Different actions often produce the same output (e.g. empty output, same error),
+        # so answers are also cached by category + output content (whitespace-normalized)
+        output_digest = hashlib.sha256(" ".join(command_output.split()).encode()).hexdigest()
 
-        category_paths = extract_paths(DEFAULT_STATE_STRUCTURE)
-        full_responses = {}
+        # Probe the caches first, so all the missing categories can be sent to the LLM together
+        # (the per-action cache is probed with the pre-split category paths, no key string per category)
+        action = self.last_action
+        pending = []
+        for cat_path, parts, dotted_path in zip(category_paths, _CATEGORY_PARTS, _CATEGORY_PATHS_DOTTED):
+            cached_response = self.llm_cache.get_path(action, parts)
 
-        for cat_path in category_paths:
-            key = f"{self.last_action}::{cat_path}"
-            cached_response = self.llm_cache.get(key)
+            if not cached_response:
+                content_key = f"{cat_path}::{output_digest}"
+                cached_response = self.output_llm_cache.get(content_key)
+                if cached_response:
+                    self.llm_cache.set_path(action, parts, cached_response)
 
             if cached_response:
                 #print(f"\033[93m[CACHE] Using cached response for {cat_path}\033[0m")
-                response = cached_response if isinstance(cached_response, str) else json.dumps(cached_response)
+                full_responses[cat_path] = cached_response if isinstance(cached_response, str) else orjson.dumps(cached_response).decode()
             else:
-                prompt = PROMPT(command_output, cat_path.replace("::", "."))
-                response = self.model.run(prompt, context_num)
-                response = extract_model_response(response)
-                if is_valid_json(response):
-                    response_list = json.loads(response)
-                    # ודא שזו באמת רשימה
-                    if isinstance(response_list, list):
-                        # שמור במטמון
-                        self.llm_cache.set(key, response_list)
-                        continue
-
-                response = response.strip()
-                self.llm_cache.set(key, response)
+                pending.append((cat_path, parts, content_key, PROMPT(command_output, dotted_path)))
+
+        # Only the cache misses go to the LLM, as one batch
+        responses = self.model.run_batch([prompt for _, _, _, prompt in pending], context_num) if pending else []
+
+        # Answers by output content are saved together at the end (one cache file write)
+        content_entries = []
+        for (cat_path, parts, content_key, _), raw_response in zip(pending, responses):
+            response = extract_model_response(raw_response)
+            # Parse once: invalid JSON gives _SENTINEL, which is not a list either
+            response_list = parse_json(response)
+            # ודא שזו באמת רשימה
+            if isinstance(response_list, list):
+                # שמור במטמון
+                self.llm_cache.set_path(action, parts, response_list)
+                content_entries.append((content_key, response_list))
+                continue
+
+            response = response.strip()
+            self.llm_cache.set_path(action, parts, response)
+            content_entries.append((content_key, response))
 
             full_responses[cat_path] = response
 
+        if content_entries:
+            self.output_llm_cache.set_many(content_entries)
+
+        # Keep the responses in category order
+        full_responses = {cat_path: full_responses[cat_path] for cat_path in category_paths if cat_path in full_responses}
+
         combined_response = "\n".join(full_responses.values())
         #print(f"[✓] Combined model response length: {len(combined_response)} characters.")
         #print(f"[DEBUG] full_response - {combined_response}")
@@ -370,43 +596,29 @@ class BaseAgent(ABC):
         - Lists are merged: new values are added if they don't already exist.
         - Works in-place on a copy of `state` and returns the new state.
         """
-        import copy
-        updated = copy.deepcopy(state)  # כדי לא לשנות את המקור
-
-        def recurse(state_node, category_node):
-            if isinstance(category_node, dict) and isinstance(state_node, dict):
-                for key, cat_val in category_node.items():
-                    if key not in state_node:
-                        continue  # התעלם ממפתחות שלא קיימים ב־state
-
-                    state_val = state_node[key]
-
-                    if isinstance(cat_val, dict):
-                        recurse(state_val, cat_val)
-
-                    elif isinstance(cat_val, list) and isinstance(state_val, list):
-                        if cat_val == "NO":
-                            continue
-                        # רק מוסיף פריטים חדשים לרשימה מבלי למחוק קיימים
-                        for item in cat_val:
-                            if item not in state_val:
-                                state_val.append(item)
-
-                    elif cat_val != "NO":
-                        # עדכן רק אם הערך הנוכחי ב־state ריק ("" או None)
-                        if state_val in ["", None]:
-                            state_node[key] = cat_val
-
-            return
+        updated = clone_state(state)  # כדי לא לשנות את המקור
+        if not isinstance(categories, dict):
+            return updated
+
+        # Walk only the known category paths instead of recursing over the whole categories tree
+        for parents, leaf in _MERGE_PLAN:
+            state_node, category_node = updated, categories
+            for key in parents:
+                state_node, category_node = state_node.get(key), category_node.get(key)
+                if not isinstance(state_node, dict) or not isinstance(category_node, dict):
+                    break
+            else:
+                if leaf in category_node and leaf in state_node:
+                    _merge_category_value(state_node, leaf, category_node[leaf])
 
-        recurse(updated, categories)
         return updated
 
-    def clean_output(self, command_output: str) -> dict:
+    def clean_output(self, command_output: str) -> Future:
         """
         Clean long noisy outputs using a cleanup prompt and the LLM.
+        Returns a Future, so the cleanup can be in flight together with other prompts.
         """
-        return self.model.run_prompt(clean_output_prompt(command_output))
+        return self.model.submit(clean_output_prompt(command_output))
 
     def update_policy(self, state, action, reward, next_state):
         """
@@ -431,7 +643,7 @@ class BaseAgent(ABC):
         #new_state = new_state = correct_state(state=new_state, os_linux_dataset=self.os_linux_dataset, os_linux_kernel_dataset=self.os_linux_kernel_dataset)
         #print(f"[DEBUG] correct_state: {new_state}")
 
-        new_state = clean_state(current_state, initialize_blackboard())
+        new_state = clean_state(current_state, _blackboard_template())
 
         # Ensure the state is a dictionary
         if not isinstance(new_state, dict):
@@ -6,7 +6,6 @@ import signal
 import os
 from datetime import datetime
 import torch
-import numpy as np
 
 from utils.utils import does_not_contain_brackets_or_exploit_warning
 from agents.base_agent import BaseAgent
@@ -88,12 +87,6 @@ class ExploitAgent(BaseAgent):
             print("[!] No valid CVEs with encoded actions.")
             return
 
-        # שלב 2: קבלת Q-values לכל action
-        state_tensor = encoded_state.clone().detach().float().unsqueeze(0).to(self.device)
-        all_q_values = self.policy_model(state_tensor).cpu().detach().numpy().flatten()
-
-        candidate_q_values = [all_q_values[i] for i in candidate_indices]
-
         forced_cve = "CVE-2011-2523" # DEBUG
 
         if forced_cve in candidate_cves:
@@ -104,7 +97,13 @@ class ExploitAgent(BaseAgent):
                 selected_idx = random.randint(0, len(candidate_indices) - 1)
                 print("[ExploitAgent] Exploring...")
             else:
-                selected_idx = int(np.argmax(candidate_q_values))
+                # שלב 2: קבלת Q-values - only when exploiting; the candidates' argmax stays on the
+                # model's device and only the selected index is copied back
+                state_tensor = encoded_state.detach().float().unsqueeze(0).to(self.device)
+                with torch.no_grad():
+                    all_q_values = self.policy_model(state_tensor).squeeze(0)
+                    candidates = torch.as_tensor(candidate_indices, device=all_q_values.device)
+                    selected_idx = int(all_q_values.index_select(0, candidates).argmax())
                 #print("[ExploitAgent] Exploiting best predicted CVE...")
 
         selected_cve = candidate_cves[selected_idx]
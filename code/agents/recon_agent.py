@@ -46,6 +46,13 @@ def traverse_schema_key(data, key_parts):
 
         return results
 
+# Rewarded schema keys, precomputed once: (raw_key, reward weight, key parts)
+_REWARD_KEYS = tuple(
+    (raw_key, meta["reward"], raw_key.split("."))
+    for raw_key, meta in STATE_SCHEMA.items()
+    if meta.get("reward", 0.0) > 0
+)
+
 class ReconAgent(BaseAgent):
     """
     A specialized agent for reconnaissance actions in the attack simulation.
@@ -148,8 +155,6 @@ class ReconAgent(BaseAgent):
         reward = 0.0
         reasons = []
 
-        schema = self.state_encoder.schema
-
         # 1) Action repeat penalty / first-time bonus
         if action in self.actions_history:
             cnt = self.actions_history.count(action)
@@ -172,19 +177,7 @@ class ReconAgent(BaseAgent):
             return [str(v).strip()] if str(v).strip() else []
 
         # traverse and compare for each schema key
-        for raw_key, meta in schema.items():
-            weight = meta.get("reward", 0.0)
-            if weight <= 0:
-                continue
-
-            # parse key parts for list recursion
-            parts = []
-            for part in raw_key.split("."):
-                if part.endswith("[]"):
-                    parts.append(part[:-2] + "[]")
-                else:
-                    parts.append(part)
-
+        for raw_key, weight, parts in _REWARD_KEYS:
             prev_vals = traverse_schema_key(prev_dict, parts)
             next_vals = traverse_schema_key(next_dict, parts)
 
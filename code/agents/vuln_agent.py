@@ -26,6 +26,12 @@ def extract_all_cpe_matches(node):
             matches.extend(extract_all_cpe_matches(child))
 
     return matches
+
+# Lowercased names of every service family, built once
+_FAMILY_NAMES = {
+    family: tuple(name.lower() for name in aliases)
+    for family, aliases in SERVICE_FAMILIES.items()
+}
     
 class VulnAgent(BaseAgent):
     """
@@ -114,9 +120,7 @@ class VulnAgent(BaseAgent):
         # שלב 2: הרחבת שירותים לפי משפחות
         expanded_service_names = set()
         for service in service_names:
-            family = SERVICE_FAMILIES.get(service, [service])
-            expanded = [name.lower() for name in family]
-            expanded_service_names.update(expanded)
+            expanded_service_names.update(_FAMILY_NAMES.get(service, (service.lower(),)))
 
 
         # שלב 3: חיפוש התאמות בין CVE→CPE למוצרים
@@ -1,11 +1,105 @@
 import time
-import copy
-import json
+import orjson
+import os
+import atexit
+import threading
+from collections import defaultdict, deque
+from itertools import islice
 
 from config import BLACKBOARD_PATH
+from utils.utils import clone_state
 from utils.state_check.state_sorting import sort_state
 from utils.state_check.state_validator import validate_state
 
+class _BackgroundWriter:
+    """
+    Daemon thread that writes blackboard snapshots and log lines off the agents' hot path.
+    Snapshot requests are coalesced: only the latest state of each dirty blackboard file is written.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._dirty = {}   # json_path -> BlackboardAPI
+        self._lines = []   # (path, line), line None = truncate the file
+        self._busy = False
+        self._thread = threading.Thread(target=self._loop, name="blackboard-writer", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, api):
+        with self._cond:
+            self._dirty[api.json_path] = api
+            self._cond.notify_all()
+
+    def append_line(self, path: str, line: bytes):
+        with self._cond:
+            self._lines.append((path, line))
+            self._cond.notify_all()
+
+    def truncate(self, path: str):
+        """
+        Queue emptying a log file, ordered with the lines queued before and after it.
+        """
+        self.append_line(path, None)
+
+    def flush(self):
+        """
+        Block until everything queued so far was written.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: not self._dirty and not self._lines and not self._busy)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty or self._lines)
+                dirty, self._dirty = self._dirty, {}
+                lines, self._lines = self._lines, []
+                self._busy = True
+            try:
+                self._write_lines(lines)
+                for api in dirty.values():
+                    api._write_snapshot()
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _write_lines(lines):
+        by_path = {}   # path -> [truncate first, lines]
+        for path, line in lines:
+            entry = by_path.setdefault(path, [False, []])
+            if line is None:
+                # Lines queued before the truncation would be dropped anyway
+                entry[0] = True
+                entry[1].clear()
+            else:
+                entry[1].append(line)
+        for path, (truncate, path_lines) in by_path.items():
+            try:
+                with open(path, "wb" if truncate else "ab") as f:
+                    f.write(b"".join(path_lines))
+            except Exception as e:
+                print(f"[!] Failed to append to {path}: {e}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _BackgroundWriter:
+    """
+    Return the process-wide writer, starting it on first use (one thread shared by all BlackboardAPI instances).
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _BackgroundWriter()
+                atexit.register(_writer.flush)
+    return _writer
+
+
 class BlackboardAPI:
     """
     Provides controlled access and updates to a shared blackboard dictionary.
@@ -19,17 +113,41 @@ class BlackboardAPI:
         Args:
             blackboard_dict (dict): A dictionary representing the shared state.
         """
+        # Bumped on every blackboard change, so agents can tell whether a state they already read is still current
+        self.version = 0
+        # Held while the blackboard is replaced in several steps (clear + update) and while the
+        # writer serializes it, so a snapshot never sees the intermediate (empty) state
+        self._lock = threading.Lock()
         self.blackboard = blackboard_dict
         self.json_path = json_path
+        # Append-only events (action log, rewards, errors) go to a sidecar newline-delimited log
+        self.log_path = os.path.splitext(json_path)[0] + ".jsonl"
+        # A fresh blackboard starts a fresh log, so it doesn't grow across runs
+        _get_writer().truncate(self.log_path)
+        # Recent action log entries of each agent, newest last
+        self._per_agent_log = defaultdict(lambda: deque(maxlen=1024))
         self._save_to_file()
     
-    def fill_state(self, actions_history: dict):
-        self.blackboard["actions_history"] = actions_history.copy()
-        self.blackboard["cpes"] = []
-        self.blackboard["vulnerabilities_found"] = []   
-        self.blackboard["attack_impact"] = {}
-        self.blackboard["failed_CVEs"] = []
-        
+    @property
+    def blackboard(self) -> dict:
+        return self._blackboard
+
+    @blackboard.setter
+    def blackboard(self, blackboard_dict: dict):
+        self._blackboard = blackboard_dict
+        self.version += 1
+
+    def fill_state(self, actions_history: list):
+        """
+        Set the agent's actions history and reset the per-step fields.
+        The version only changes when a reset field actually changed (the history is always replaced).
+        """
+        self.blackboard["actions_history"] = list(actions_history)
+        for key, empty in (("cpes", []), ("vulnerabilities_found", []), ("attack_impact", {}), ("failed_CVEs", [])):
+            if self.blackboard.get(key) != empty:
+                self.blackboard[key] = empty
+                self.version += 1
+
 
     def get_state_for_agent(self, agent_name: str) -> dict:
         """
@@ -41,7 +159,7 @@ class BlackboardAPI:
         Returns:
             dict: A deep copy of the current state.
         """
-        return copy.deepcopy(self.blackboard)
+        return clone_state(self.blackboard)
 
     def append_action_log(self, entry: dict):
         """
@@ -52,7 +170,8 @@ class BlackboardAPI:
         """
         #entry["timestamp"] = time.time()
         #self.blackboard.setdefault("actions_log", []).append(entry) Now for debuging
-        self._save_to_file()
+        self._per_agent_log[entry.get("agent")].append(entry)
+        self._append_to_log("action", entry)
 
     def record_reward(self, action: str, reward: float):
         """
@@ -68,7 +187,8 @@ class BlackboardAPI:
             "timestamp": time.time()
         }
         self.blackboard.setdefault("reward_log", []).append(entry)
-        self._save_to_file()
+        self.version += 1
+        self._append_to_log("reward", entry)
 
     def add_error(self, agent: str, action: str, error: str):
         """
@@ -86,7 +206,8 @@ class BlackboardAPI:
             "timestamp": time.time()
         }
         self.blackboard.setdefault("errors", []).append(entry)
-        self._save_to_file()
+        self.version += 1
+        self._append_to_log("error", entry)
 
     def get_last_actions(self, agent: str, n: int = 5):
         """
@@ -99,6 +220,9 @@ class BlackboardAPI:
         Returns:
             list: List of recent action log entries.
         """
+        if agent in self._per_agent_log:
+            return list(islice(reversed(self._per_agent_log[agent]), n))
+
         return [
             log for log in reversed(self.blackboard.get("actions_log", []))
             if log.get("agent") == agent
@@ -135,8 +259,9 @@ class BlackboardAPI:
        # self._smart_merge(self.blackboard, new_state)
         #self.blackboard = validate_state(self.blackboard)
         #self.blackboard = sort_state(self.blackboard)
-        self.blackboard.clear()
-        self.blackboard.update(new_state)
+        with self._lock:
+            self.blackboard.clear()
+            self.blackboard.update(new_state)
         self._save_to_file()
 
     def _smart_merge(self, base: dict, incoming: dict):
@@ -209,13 +334,47 @@ class BlackboardAPI:
         if not isinstance(new_state, dict):
             raise ValueError("new_state must be a dictionary")
 
-        self.blackboard.clear()
-        self.blackboard.update(new_state)
+        with self._lock:
+            self.blackboard.clear()
+            self.blackboard.update(new_state)
         self._save_to_file()
     
+    def flush(self):
+        """
+        Block until all pending blackboard writes and log lines are on disk.
+        """
+        _get_writer().flush()
+
     def _save_to_file(self):
+        """
+        Mark the blackboard as dirty; the background writer saves its latest state.
+        """
+        self.version += 1
+        _get_writer().mark_dirty(self)
+
+    def _append_to_log(self, kind: str, entry: dict):
+        """
+        Queue a single event line for the sidecar log instead of rewriting the whole blackboard.
+        """
+        try:
+            line = orjson.dumps({"type": kind, **entry}, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        except Exception as e:
+            print(f"[!] Failed to serialize {kind} log entry: {e}")
+            return
+        _get_writer().append_line(self.log_path, line)
+
+    def _write_snapshot(self):
+        """
+        Serialize the blackboard and atomically replace the json file (runs on the writer thread).
+        orjson serializes in one call without releasing the GIL, so the snapshot is consistent
+        even while agents keep mutating the blackboard.
+        """
+        tmp_path = self.json_path + ".tmp"
         try:
-            with open(self.json_path, "w", encoding="utf-8") as f:
-                json.dump(self.blackboard, f, indent=2)
+            with self._lock:
+                data = orjson.dumps(self.blackboard, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.json_path)
         except Exception as e:
-            print(f"[!] Failed to save blackboard to {self.json_path}: {e}")
\ No newline at end of file
+            print(f"[!] Failed to save blackboard to {self.json_path}: {e}")
@@ -1,8 +1,9 @@
-import copy
-from config import DEFAULT_STATE_STRUCTURE
+import config
+from utils.utils import clone_state
 
 def initialize_blackboard(target_ip: str = ""):
-    blackboard = copy.deepcopy(DEFAULT_STATE_STRUCTURE)
+    # Every access to config.DEFAULT_STATE_STRUCTURE already builds a fresh copy
+    blackboard = config.DEFAULT_STATE_STRUCTURE
     if target_ip:
         try:
             blackboard["target"]["ip"] = target_ip
@@ -11,5 +12,5 @@ def initialize_blackboard(target_ip: str = ""):
     return blackboard
 
 def initialize_dict(Dict: dict):
-    Dict = copy.deepcopy(Dict)
+    Dict = clone_state(Dict)
     return Dict
\ No newline at end of file
@@ -26,6 +26,10 @@ WORDLISTS = {
 LLAMA_RUN_PATH = f"{PROJECT_PATH}/code/models/llama.cpp/build/bin/llama-run"
 MISTRAL_MODEL_PATH = f"{PROJECT_PATH}/code/models/nous-hermes/Nous-Hermes-2-Mistral-7B-DPO.Q4_K_M.gguf"
 
+# Number of LLM prompts that may run at the same time (each one is a separate llama-run process
+# loading the model, so raise it only if there is memory for that many copies)
+LLM_MAX_PARALLEL_PROMPTS = 1
+
 
 # CACHE CONFIGURATION
 
@@ -35,6 +39,9 @@ LLM_CACHE_PATH = f"{PROJECT_PATH}/code/Cache/llm_cache.json"
 # Command LLM cache path
 COMMAND_LLM_CACHE_PATH = f"{PROJECT_PATH}/code/Cache/command_llm_cache.pkl"
 
+# LLM answers cache by command output content (runtime data, not tracked)
+OUTPUT_LLM_CACHE_PATH = f"{PROJECT_PATH}/code/Cache/output_llm_cache.pkl"
+
 # Correctness cache
 CORRECTNESS_CACHE = f"{PROJECT_PATH}/code/Cache/correctness_cache.json"
 
@@ -86,9 +93,9 @@ BLACKBOARD_PATH = f"{PROJECT_PATH}/code/blackboard/blackboard.json"
 # STATE CONFIGURATION #
 
 # Web Status codes
-EXPECTED_STATUS_CODES = [
+EXPECTED_STATUS_CODES = (
     "200", "301", "302", "307", "401", "403", "500", "502", "503", "504"
-]
+)
 
 # Default state structure
 _BASE_DEFAULT_STATE = {
@@ -142,16 +149,26 @@ _BASE_DEFAULT_STATE = {
       ]
 """
 
-import copy
+# Builder that returns a fresh copy of the default structure on every call.
+# Generated once from the literal's repr, so each call just evaluates the
+# dict/list literal instead of walking the tree like deepcopy does.
+_build_default_state = eval("lambda: " + repr(_BASE_DEFAULT_STATE))
+
+# Attributes generated on every access (so every use of default stracture will be a fresh copy)
+_GENERATORS = {
+    "DEFAULT_STATE_STRUCTURE": _build_default_state,
+}
 
-# Making that every use of default stracture will be with deepcopy
 def __getattr__(name):
-    if name == "DEFAULT_STATE_STRUCTURE":
-        return copy.deepcopy(_BASE_DEFAULT_STATE)
+    gen = _GENERATORS.get(name)
+    if gen is not None:
+        return gen()
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Web status codes reward
-WEB_DIRECTORIES_STATUS_CODES_REWARD = {
+import types
+
+# Web status codes reward (read-only)
+WEB_DIRECTORIES_STATUS_CODES_REWARD = types.MappingProxyType({
     "200": 0.1,
     "301": 0.05,
     "302": 0.05,
@@ -162,7 +179,7 @@ WEB_DIRECTORIES_STATUS_CODES_REWARD = {
     "502": 0.09,
     "503": 0.09,
     "504": 0.04
-}
+})
 
 # state schema ( An explanation of the state). TODO: fix llm_prompt
 STATE_SCHEMA = {
@@ -242,9 +259,9 @@ STATE_SCHEMA = {
     "llm_prompt": ""
   },
   "target.services[].port": {
-    "type": "int",
-    "encoder": "normalize_by_specific_number",
-    "num_for_normalization": 65536,
+    # Kept as string / base100: the definition in effect when the saved models were trained
+    "type": "string",
+    "encoder": "base100_encode",
     "reward": 0.1,
     "llm_prompt": "Port number of the service, e.g., 22 or 80."
   },
@@ -277,32 +294,32 @@ STATE_SCHEMA = {
     "correction_func": "correct_rpc_services",
     "llm_prompt": ""
   },
-  "target.services[].program_number": {
+  "target.rpc_services[].program_number": {
     "type": "int",
     "encoder": "normalize_by_specific_number",
     "num_for_normalization": 999999,
     "reward": 0.1,
     "llm_prompt": "RPC program number associated with the service."
   },
-  "target.services[].version": {
+  "target.rpc_services[].version": {
     "type": "string",
     "encoder": "base100_encode",
     "reward": 0,
     "llm_prompt": "Version of the application-level service."
   },
-    "target.services[].protocol": {
+  "target.rpc_services[].protocol": {
     "type": "string",
     "encoder": "base100_encode",
     "reward": 0,
     "llm_prompt": "Transport protocol used by the service, e.g., 'tcp'."
   },
-    "target.services[].port": {
+  "target.rpc_services[].port": {
     "type": "string",
     "encoder": "base100_encode",
     "reward": 0.1,
     "llm_prompt": "Port number of the service, e.g., 22 or 80."
   },
-  "target.services[].service_name": {
+  "target.rpc_services[].service_name": {
     "type": "string",
     "encoder": "base100_encode",
     "reward": 0.1,
@@ -552,78 +569,107 @@ STATE_SCHEMA = {
   }
 }
 
-# Dynamic addition of status-specific entries
-for status in EXPECTED_STATUS_CODES:
-    STATE_SCHEMA[f"web_directories_status.{status}"] = {
-        "type": "dict",
-        "encoder": "count_encoder",
-        "reward": WEB_DIRECTORIES_STATUS_CODES_REWARD[status]
-    }
-
-STATE_SCHEMA["target.services"]["llm_prompt"] = f"""List of discovered network services on the target system: 
-{STATE_SCHEMA.get("target.services[].port")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].protocol")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].service")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].server_type")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].server_version")["llm_prompt"]}
-
-For example: {{\"port\": \"\", \"protocol\": \"\", \"service\": \"\", \"server_type\": \"\", \"server_version\": \"\"}}, 
-{{\"port\": \"\", \"protocol\": \"\", \"service\": \"\", \"server_type\": \"\", \"server_version\": \"\"}}.
-
-And most important: return it as a valid JSON.
-Very important: the JSON should be exactly like this in the order — do not change it. At the end, go over it again and check.
-Always return with [""] even if there is even one item inside and alweys put "" even if they empty"""
+import sys
+
+_LIST_PROMPT_FOOTER = """And most important: return it as a valid JSON.
+Very important: the JSON should be exactly like this in the order — do not change it. At the end, go over it again and check."""
 
+_SERVICES_PROMPT_TAIL = """
 
-STATE_SCHEMA["target.rpc_services"]["llm_prompt"] = f"""List of detected RPC services running on the target:
-{STATE_SCHEMA.get("target.services[].program_number")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].version")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].protocol")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].port")["llm_prompt"]},
-{STATE_SCHEMA.get("target.services[].service_name")["llm_prompt"]}
+For example: {"port": "", "protocol": "", "service": "", "server_type": "", "server_version": ""}, 
+{"port": "", "protocol": "", "service": "", "server_type": "", "server_version": ""}.
 
-For example: {{\"program_number\": \"\", \"version\": \"\", \"protocol\": \"\", \"port\": \"\", \"service_name\": \"\"}}, 
-{{\"program_number\": \"\", \"version\": \"\", \"protocol\": \"\", \"port\": \"\", \"service_name\": \"\"}}.
+""" + _LIST_PROMPT_FOOTER + """
+Always return with [""] even if there is even one item inside and alweys put "" even if they empty"""
+
+_RPC_SERVICES_PROMPT_TAIL = """
+
+For example: {"program_number": "", "version": "", "protocol": "", "port": "", "service_name": ""}, 
+{"program_number": "", "version": "", "protocol": "", "port": "", "service_name": ""}.
 
 Return only RPC services discovered via actual RPC-related tools (e.g., `rpcinfo`, `nmap -sU -p 111`, or `showmount`).
 Each entry must represent a true RPC program with a valid `program_number` and known RPC service.
 ⚠️ Do not include regular services like 'http', 'ftp', 'mysql', etc. These are NOT RPC services. 
 If no RPC services are found, return an empty list: [""], Do not leave []!!!
 
-And most important: return it as a valid JSON.
-Very important: the JSON should be exactly like this in the order — do not change it. At the end, go over it again and check.
+""" + _LIST_PROMPT_FOOTER + """
 Must be RPC services only and not the regular ones
 Always return with [""] even if there is even one item inside"""
 
+_SMB_SHARES_PROMPT_TAIL = """,
 
-STATE_SCHEMA["target.smb_shares"]["llm_prompt"] = f"""List of all discovered SMB shares on the target:
-{STATE_SCHEMA.get("target.smb_shares[].share_name")["llm_prompt"]},
-{STATE_SCHEMA.get("target.smb_shares[].access")["llm_prompt"]},
-{STATE_SCHEMA.get("target.smb_shares[].comment")["llm_prompt"]},
-
-For example: {{\"share_name\": \"\", \"access\": \"\", \"comment\": \"\"}}, 
-{{\"share_name\": \"\", \"access\": \"\", \"comment\": \"\"}}.
+For example: {"share_name": "", "access": "", "comment": ""}, 
+{"share_name": "", "access": "", "comment": ""}.
 
 Return only SMB shares discovered via actual SMB-related tools (e.g., `smbmap`, `smbclient`, or `nmap --script smb-enum-shares`).  
 Each entry must represent a real SMB share with valid fields: `share_name`, `access`, and `comment`.  
 ⚠️ Do not include unrelated services like 'http', 'ftp', or 'mysql' — these are NOT SMB shares.  
 If no SMB shares are found, return an empty list: [""].
 
-And most important: return it as a valid JSON.
-Very important: the JSON should be exactly like this in the order — do not change it. At the end, go over it again and check.
+""" + _LIST_PROMPT_FOOTER + """
 Must be RPC services only and not the regular ones
 Always return with [""] even if there is even one item inside and alweys put "" even if they empty"""
 
+def _list_prompt(schema, header, item_keys, tail):
+    """
+    Build a list field's llm_prompt: its header, the prompts of its item fields
+    (one per line), and the fixed instructions tail.
+    """
+    return header + ",\n".join([schema[key]["llm_prompt"] for key in item_keys]) + tail
+
+def _finalize_schema(schema):
+    """
+    Add the per-status-code entries, build the list fields' llm_prompts from
+    their item fields, and intern the keys (dotted paths aren't interned
+    automatically like identifier-like literals, so lookups can compare by pointer).
+    """
+    # Dynamic addition of status-specific entries
+    for status in EXPECTED_STATUS_CODES:
+        schema[f"web_directories_status.{status}"] = {
+            "type": "dict",
+            "encoder": "count_encoder",
+            "reward": WEB_DIRECTORIES_STATUS_CODES_REWARD[status]
+        }
+
+    schema["target.services"]["llm_prompt"] = _list_prompt(
+        schema,
+        "List of discovered network services on the target system: \n",
+        ("target.services[].port", "target.services[].protocol", "target.services[].service",
+         "target.services[].server_type", "target.services[].server_version"),
+        _SERVICES_PROMPT_TAIL,
+    )
 
+    schema["target.rpc_services"]["llm_prompt"] = _list_prompt(
+        schema,
+        "List of detected RPC services running on the target:\n",
+        ("target.rpc_services[].program_number", "target.rpc_services[].version", "target.rpc_services[].protocol",
+         "target.rpc_services[].port", "target.rpc_services[].service_name"),
+        _RPC_SERVICES_PROMPT_TAIL,
+    )
+
+    schema["target.smb_shares"]["llm_prompt"] = _list_prompt(
+        schema,
+        "List of all discovered SMB shares on the target:\n",
+        ("target.smb_shares[].share_name", "target.smb_shares[].access", "target.smb_shares[].comment"),
+        _SMB_SHARES_PROMPT_TAIL,
+    )
 
+    return {sys.intern(key): meta for key, meta in schema.items()}
 
+STATE_SCHEMA = _finalize_schema(STATE_SCHEMA)
 
 
 
 
 
 
-SERVICE_FAMILIES = {
+
+
+
+
+
+# family -> aliases (frozensets, for O(1) membership checks)
+SERVICE_FAMILIES = {family: frozenset(aliases) for family, aliases in {
     # Remote Access
     "ssh": ["ssh", "openssh", "dropbear"],
     "telnet": ["telnet", "inetutils-telnet"],
@@ -723,4 +769,4 @@ SERVICE_FAMILIES = {
     "tftp": ["tftp", "atftpd"],
     "rsync": ["rsync"],
     "xinetd": ["xinetd"],
-}
+}.items()}
@@ -48,6 +48,14 @@ class StateEncoder:
         self.feature_keys = sorted(flat_defaults.keys())
         self.feature_keys += [f"action_history_idx_{i}" for i in range(len(self.action_space))] #DEBUG for now
 
+        # 2) resolve each feature's normalization once: encoded = raw / divisor, capped at 1.0 where clip is set.
+        # State features come first in feature_keys, then the action history counts.
+        self._num_features = min(len(self.feature_keys), MAX_ENCODING_FEATURES)
+        self._num_state_features = min(len(flat_defaults), self._num_features)
+        scaling = [self._feature_scaling(key) for key in self.feature_keys[:self._num_features]]
+        self._divisors = np.array([divisor for divisor, _ in scaling], dtype=np.float64)
+        self._clip = np.array([clip for _, clip in scaling], dtype=np.bool_)
+
     def base100_encode(self, text: str) -> float:
         """
         Encodes a string to a base-100 floating point number in [0, 1).
@@ -73,6 +81,25 @@ class StateEncoder:
         norm = cfg.get("num_for_normalization", 1.0)
         return min(value / norm, 1.0)
     
+    def _feature_scaling(self, key: str) -> tuple:
+        """
+        (divisor, clip) of a feature, matching _apply_encoder / _normalize_value for numeric raw values
+        (_flatten_state only produces floats).
+        """
+        enc = self.schema.get(key, {}).get("encoder")
+
+        if enc == "base100_encode":
+            return 1.0, False
+        if enc == "count_encoder":
+            return 100.0, True
+        if enc == "normalize_by_specific_number":
+            return self.schema.get(key, {}).get("num_for_normalization", 1.0), True
+        if "action_history" in key:
+            return 1.0, False
+        if "failed_cve_idx" in key:
+            return 99999999.0, True
+        return 1e6, True
+
     def _apply_encoder(self, key: str, raw):
         entry = self.schema.get(key, {})
         enc = entry.get("encoder")
@@ -89,34 +116,53 @@ class StateEncoder:
 
         return self._normalize_value(key, raw)
 
-    def encode(self, state: dict, actions_history: list) -> torch.Tensor:
+    def encode(self, state: dict, actions_history: list, out: torch.Tensor = None, action_counts: np.ndarray = None) -> torch.Tensor:
+        """
+        Encode a state into a fixed-length float32 vector of MAX_ENCODING_FEATURES.
+
+        Args:
+            state (dict): Raw blackboard state.
+            actions_history (list): Actions taken so far.
+            out (torch.Tensor, optional): Preallocated CPU float32 tensor of MAX_ENCODING_FEATURES
+                                          to write the encoding into (like NumPy's out=).
+            action_counts (np.ndarray, optional): Per-action counts of actions_history (in action_space order),
+                                                  if the caller keeps them; saves recounting the whole history.
+
+        Returns:
+            torch.Tensor: The encoded vector (`out` itself when given).
+        """
         # 1) flatten
         flat = self._flatten_state(state)
 
         # 2) action history
-        actions_vector = np.zeros(len(self.action_space), dtype=np.float32)
-        for a in actions_history:
-            idx = self.action_to_index.get(a)
-            if idx is not None:
-                actions_vector[idx] += 1.0
-        for i, cnt in enumerate(actions_vector):
-            flat[f"action_history_idx_{i}"] = cnt
-
-        # 3) apply encoders according to schema
-        encoded = []
-        for key in self.feature_keys:
-            raw = flat.get(key, 0.0)
-            val = self._apply_encoder(key, raw)
-            encoded.append(val)
-
-        # 4) pad/truncate
-        if len(encoded) < MAX_ENCODING_FEATURES:
-            encoded += [0.0] * (MAX_ENCODING_FEATURES - len(encoded))
+        if action_counts is not None:
+            actions_vector = action_counts
+        else:
+            actions_vector = np.zeros(len(self.action_space), dtype=np.float32)
+            for a in actions_history:
+                idx = self.action_to_index.get(a)
+                if idx is not None:
+                    actions_vector[idx] += 1.0
+
+        # 3) gather the raw values (state features, then the action history counts)
+        n, n_state = self._num_features, self._num_state_features
+        raw = np.empty(n, dtype=np.float64)
+        raw[:n_state] = [flat.get(key, 0.0) for key in self.feature_keys[:n_state]]
+        raw[n_state:] = actions_vector[:n - n_state]
+
+        # 4) apply the encoders according to schema in one vectorized pass
+        np.divide(raw, self._divisors, out=raw)
+        np.minimum(raw, 1.0, out=raw, where=self._clip)
+
+        # write into the (zero padded) output buffer; features past MAX_ENCODING_FEATURES were never gathered
+        if out is None:
+            vec = torch.zeros(MAX_ENCODING_FEATURES, dtype=torch.float32)
         else:
-            encoded = encoded[: MAX_ENCODING_FEATURES]
+            vec = out
+            vec.zero_()
+        vec.numpy()[:n] = raw
 
         # 5)
-        vec = torch.tensor(encoded, dtype=torch.float32)
         vk = self._vector_to_key(vec)
         if vk not in self.encoded_to_state:
             self.encoded_to_state[vk] = state
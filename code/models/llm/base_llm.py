@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List
 
+from config import LLM_MAX_PARALLEL_PROMPTS
+
 class BaseLLM(ABC):
     """
     Abstract base class for LLM interfaces.
     All language model implementations must inherit from this class and implement the following methods.
     """
 
+    # Shared by all the prompts submitted to this model, created on first use
+    _executor = None
+
     @abstractmethod
     def run(self, prompts: List[str]) -> List[str]:
         """
@@ -20,4 +26,22 @@ class BaseLLM(ABC):
         """
         Counts the number of tokens in the given text.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def submit(self, *args, **kwargs) -> Future:
+        """
+        Schedules `run(*args, **kwargs)` on a background thread and returns a Future for its output.
+        Lets callers send several independent prompts without waiting on each one.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=LLM_MAX_PARALLEL_PROMPTS)
+        return self._executor.submit(self.run, *args, **kwargs)
+
+    def run_batch(self, prompts: List[str], *args, **kwargs) -> List[str]:
+        """
+        Runs several independent prompts and returns their outputs in the same order.
+        The default runs them concurrently through `submit`; models with a real batched
+        forward pass can override it.
+        """
+        futures = [self.submit(prompt, *args, **kwargs) for prompt in prompts]
+        return [future.result() for future in futures]
@@ -15,15 +15,17 @@ class LlamaModel(BaseLLM):
 
     def __init__(self, context_size=8000):
         self.context_size= context_size
-        
+
+        # Load the tokenizer once instead of looking it up on every prompt
+        self.encoding = tiktoken.get_encoding("cl100k_base")
+
         print("✅ Llama Model initialized successfully.")
 
     def count_tokens(self, text: str) -> int:
         """
         Count the number of tokens in a text string using cl100k_base tokenizer.
         """
-        enc = tiktoken.get_encoding("cl100k_base")
-        return len(enc.encode(text, disallowed_special=()))
+        return len(self.encoding.encode(text, disallowed_special=()))
 
     def run(self, prompt: str, context_num = 1) -> str:
         context_length = str(context_num * self.context_size)
@@ -81,26 +81,33 @@ class PolicyModel(nn.Module):
         Returns:
             tuple: (predicted_q_value, loss_value)
         """
-        state = experience["state"]
-        action = torch.tensor([experience["action"]], dtype=torch.long)
-        reward = torch.tensor([experience["reward"]], dtype=torch.float32)
-        next_state = experience["next_state"]
+        return self.update_batch([experience])
 
-        if state.ndim == 1:
-            state = state.unsqueeze(0)
-        if next_state.ndim == 1:
-            next_state = next_state.unsqueeze(0)
+    def update_batch(self, experiences):
+        """
+        Perform one Q-learning update (a single optimizer step) on a batch of experiences.
+
+        Args:
+            experiences (list): List of dicts, each containing 'state', 'action', 'reward', 'next_state'.
+
+        Returns:
+            tuple: (mean_predicted_q_value, loss_value)
+        """
+        states = torch.stack([exp["state"].reshape(-1) for exp in experiences])
+        actions = torch.tensor([exp["action"] for exp in experiences], dtype=torch.long)
+        rewards = torch.tensor([exp["reward"] for exp in experiences], dtype=torch.float32)
+        next_states = torch.stack([exp["next_state"].reshape(-1) for exp in experiences])
 
         # Q(s, a)
-        q_values = self.forward(state)
-        q_value = q_values.gather(1, action.unsqueeze(1)).squeeze(1)
+        q_values = self.forward(states)
+        q_value = q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
 
         # max_a' Q(next_state, a')
-        next_q_values = self.forward(next_state)
+        next_q_values = self.forward(next_states)
         max_next_q_value = next_q_values.max(1)[0].detach()
 
         # TD Target
-        td_target = reward + self.gamma * max_next_q_value
+        td_target = rewards + self.gamma * max_next_q_value
 
         # Loss = MSE(Q, TD_target)
         loss = self.loss_fn(q_value, td_target)
@@ -110,7 +117,7 @@ class PolicyModel(nn.Module):
         torch.nn.utils.clip_grad_norm_(self.parameters(), max_norm=1.0)
         self.optimizer.step()
 
-        return q_value.item(), loss.item()
+        return q_value.mean().item(), loss.item()
 
     def save(self, path):
         """
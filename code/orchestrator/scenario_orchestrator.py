@@ -1,6 +1,13 @@
+import logging
+
 from blackboard.blackboard import initialize_blackboard
 from config import MAX_STEPS_PER_EPISODE
 
+# Number of recon-only steps before switching to vuln + exploit
+RECON_STEPS = 10
+
+logger = logging.getLogger(__name__)
+
 class ScenarioOrchestrator:
     """
     Manages the execution of a penetration testing scenario.
@@ -12,6 +19,9 @@ class ScenarioOrchestrator:
     - Stop conditions enforcement
     """
 
+    __slots__ = ("blackboard", "agent_manager", "current_step", "scenario_name",
+                 "stop_conditions", "_stop_fn", "active", "target", "step")
+
     def __init__(self, blackboard, agent_manager, target, scenario_name="DefaultScenario", stop_conditions=None):
         """
         Initialize the orchestrator with simulation parameters.
@@ -28,8 +38,15 @@ class ScenarioOrchestrator:
         self.current_step = 0
         self.scenario_name = scenario_name
         self.stop_conditions = stop_conditions or []
+        # All stop conditions combined into one predicate on the blackboard dict
+        if self.stop_conditions:
+            self._stop_fn = lambda bb, _conditions=tuple(self.stop_conditions): any(c(bb) for c in _conditions)
+        else:
+            self._stop_fn = lambda bb: False
         self.active = False
         self.target = target
+        # Current phase's step method; swapped instead of branching on every step
+        self.step = self._step_recon
 
     def start(self):
         """
@@ -38,12 +55,13 @@ class ScenarioOrchestrator:
         """
         self.current_step = 0
         self.active = True
+        self.step = self._step_recon
 
         # Initialize target structure
         self.blackboard.blackboard = initialize_blackboard(self.target)
         #print(f"self.blackboard.blackboard: {self.blackboard.blackboard}")
 
-        print(f"[+] Starting scenario: {self.scenario_name}")
+        logger.info("[+] Starting scenario: %s", self.scenario_name)
 
     def should_continue(self):
         """
@@ -56,13 +74,12 @@ class ScenarioOrchestrator:
             return False
 
         if self.current_step >= MAX_STEPS_PER_EPISODE:
-            print("[!] Max steps reached.")
+            logger.debug("[!] Max steps reached.")
             return False
 
-        for condition in self.stop_conditions:
-            if condition(self.blackboard.blackboard):
-                print("[!] Stop condition met.")
-                return False
+        if self._stop_fn(self.blackboard.blackboard):
+            logger.debug("[!] Stop condition met.")
+            return False
 
         return True
 
@@ -73,28 +90,42 @@ class ScenarioOrchestrator:
             self.current_step += 1
     """
 
-    def step(self):
-        if self.current_step < 10:
-            # להריץ רק את ה־Recon בכל 10 הצעדים הראשונים
-            self.agent_manager.run_recon_only_step()
-        else:
-            # פעם אחת להריץ vuln + exploit
-            self.agent_manager.run_vuln_and_exploit_step()
+    def _step_recon(self):
+        # להריץ רק את ה־Recon בכל 10 הצעדים הראשונים
+        self.agent_manager.run_recon_only_step()
+        self.current_step += 1
+        if self.current_step >= RECON_STEPS:
+            self.step = self._step_exploit
 
+    def _step_exploit(self):
+        # פעם אחת להריץ vuln + exploit
+        self.agent_manager.run_vuln_and_exploit_step()
         self.current_step += 1
 
     def end(self):
         """
-        Mark scenario as ended and print completion message.
+        Mark scenario as ended and log completion message.
         """
         self.active = False
-        print(f"[+] Scenario '{self.scenario_name}' ended after {self.current_step} steps.")
+        logger.info("[+] Scenario '%s' ended after %d steps.", self.scenario_name, self.current_step)
 
     def run_scenario_loop(self):
         """
         Run full scenario loop from start to end.
+        Same checks as should_continue, inlined with the loop-invariant lookups hoisted.
         """
+        max_steps = MAX_STEPS_PER_EPISODE
+        stop_fn = self._stop_fn
+        blackboard = self.blackboard
+
         self.start()
-        while self.should_continue():
+        while self.active:
+            if self.current_step >= max_steps:
+                logger.debug("[!] Max steps reached.")
+                break
+            if stop_fn(blackboard.blackboard):
+                logger.debug("[!] Stop condition met.")
+                break
+            # Not hoisted: step swaps itself when the phase changes
             self.step()
         self.end()
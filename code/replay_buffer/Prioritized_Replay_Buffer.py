@@ -8,6 +8,10 @@ class PrioritizedReplayBuffer:
         """
         A prioritized experience replay buffer for deep Q-learning.
 
+        Experiences are stored as a ring buffer of preallocated, contiguous arrays
+        (one array per field), so adding is an indexed write and sampling is a single
+        fancy-index per field.
+
         Args:
             max_size (int): Maximum number of experiences to store.
             alpha (float): Priority exponent (how much prioritization is used).
@@ -17,12 +21,35 @@ class PrioritizedReplayBuffer:
         self.alpha = alpha
         self.beta = beta
 
-        self.buffer = []
-        self.priorities = []
+        # State slabs are allocated on the first add, once the state size is known
+        self.states = None
+        self.next_states = None
+        self.actions = np.zeros(max_size, dtype=np.int64)
+        self.rewards = np.zeros(max_size, dtype=np.float32)
+        self.dones = np.zeros(max_size, dtype=np.bool_)
+        self.priorities = np.zeros(max_size, dtype=np.float32)
+
+        self.cursor = 0  # next slot to write
+        self.count = 0   # number of stored experiences
+
+        # Page-locked (batch_size, *state.shape) buffers the sampled states are gathered into,
+        # so their host -> GPU copy is fast. Only used with CUDA, (re)allocated per batch size.
+        self._pinned_states = None
+        self._pinned_next_states = None
+
+    def _allocate_states(self, state):
+        """
+        Allocate the state / next_state slabs, shaped (max_size, *state.shape).
+        The slabs are ordinary pageable memory: sampling gathers into a separate (small) pinned batch.
+        """
+        shape = (self.max_size, *state.shape)
+        self.states = torch.zeros(shape, dtype=torch.float32)
+        self.next_states = torch.zeros(shape, dtype=torch.float32)
 
     def add_experience(self, state, action, reward, next_state, done):
         """
         Add a new experience to the buffer with maximum priority.
+        When the buffer is full, the oldest experience is overwritten.
 
         Args:
             state (Tensor): Current state.
@@ -31,21 +58,32 @@ class PrioritizedReplayBuffer:
             next_state (Tensor): Next state.
             done (bool): Whether the episode ended.
         """
-        max_priority = max(self.priorities) if self.buffer else 1.0
-        experience = {
-            "state": state,
-            "action": action,
-            "reward": reward,
-            "next_state": next_state,
-            "done": done
-        }
+        if self.states is None:
+            self._allocate_states(state)
+
+        max_priority = float(self.priorities[:self.count].max()) if self.count else 1.0
 
-        if len(self.buffer) >= self.max_size:
-            self.buffer.pop(0)
-            self.priorities.pop(0)
+        slot = self.cursor
+        self.states[slot].copy_(state)
+        self.next_states[slot].copy_(next_state)
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.dones[slot] = done
+        self.priorities[slot] = max_priority
 
-        self.buffer.append(experience)
-        self.priorities.append(max_priority)
+        self.cursor = (slot + 1) % self.max_size
+        self.count = min(self.count + 1, self.max_size)
+
+    def add_batch(self, experiences):
+        """
+        Add several experiences at once.
+
+        Args:
+            experiences (list): List of dicts with 'state', 'action', 'reward', 'next_state'
+                                and optionally 'done' (defaults to False).
+        """
+        for exp in experiences:
+            self.add_experience(exp["state"], exp["action"], exp["reward"], exp["next_state"], exp.get("done", False))
 
     def sample_batch(self, batch_size):
         """
@@ -56,25 +94,34 @@ class PrioritizedReplayBuffer:
 
         Returns:
             Tuple of tensors: (states, actions, rewards, next_states, dones, weights, indices)
+            With CUDA, states / next_states are reused pinned buffers, overwritten by the next call.
         """
-        if len(self.buffer) == 0:
+        if self.count == 0:
             raise ValueError("The replay buffer is empty.")
 
-        priorities = np.array(self.priorities, dtype=np.float32)
+        priorities = self.priorities[:self.count]
         scaled_priorities = priorities ** self.alpha
         sampling_probs = scaled_priorities / scaled_priorities.sum()
 
-        indices = np.random.choice(len(self.buffer), size=batch_size, p=sampling_probs)
-        experiences = [self.buffer[i] for i in indices]
+        indices = np.random.choice(self.count, size=batch_size, p=sampling_probs)
 
-        weights = (len(self.buffer) * sampling_probs[indices]) ** -self.beta
+        weights = (self.count * sampling_probs[indices]) ** -self.beta
         weights = weights / weights.max()
 
-        states = torch.stack([exp["state"] for exp in experiences])
-        actions = torch.tensor([exp["action"] for exp in experiences])
-        rewards = torch.tensor([exp["reward"] for exp in experiences])
-        next_states = torch.stack([exp["next_state"] for exp in experiences])
-        dones = torch.tensor([exp["done"] for exp in experiences])
+        index_tensor = torch.from_numpy(indices)
+        if torch.cuda.is_available():
+            batch_shape = (batch_size, *self.states.shape[1:])
+            if self._pinned_states is None or self._pinned_states.shape != batch_shape:
+                self._pinned_states = torch.empty(batch_shape, dtype=torch.float32, pin_memory=True)
+                self._pinned_next_states = torch.empty(batch_shape, dtype=torch.float32, pin_memory=True)
+            states = torch.index_select(self.states, 0, index_tensor, out=self._pinned_states)
+            next_states = torch.index_select(self.next_states, 0, index_tensor, out=self._pinned_next_states)
+        else:
+            states = self.states[index_tensor]
+            next_states = self.next_states[index_tensor]
+        actions = torch.from_numpy(self.actions[indices])
+        rewards = torch.from_numpy(self.rewards[indices])
+        dones = torch.from_numpy(self.dones[indices])
 
         return states, actions, rewards, next_states, dones, torch.tensor(weights, dtype=torch.float32), indices
 
@@ -86,18 +133,18 @@ class PrioritizedReplayBuffer:
             indices (List[int]): Indices of the sampled experiences.
             new_priorities (List[float]): Updated priority values.
         """
-        for idx, priority in zip(indices, new_priorities):
-            self.priorities[idx] = max(priority, 1e-5)
-            
+        self.priorities[np.asarray(indices)] = np.maximum(np.asarray(new_priorities, dtype=np.float32), 1e-5)
+
     def size(self):
         """
         Return the number of stored experiences.
         """
-        return len(self.buffer)
+        return self.count
 
     def clear(self):
         """
         Clear all experiences and priorities.
         """
-        self.buffer.clear()
-        self.priorities.clear()
+        self.priorities[:] = 0.0
+        self.cursor = 0
+        self.count = 0
@@ -25,7 +25,7 @@ from models.llm.llama_interface import LlamaModel
 from encoders.state_encoder import StateEncoder
 from encoders.action_encoder import ActionEncoder
 from tools.action_space import get_commands_for_agent
-from utils.utils import load_dataset
+from utils.utils import load_dataset, setup_logging
 from create_datasets.create_exploit_dataset.create_full_exploit_dataset import merge_exploit_datasets
 
 BLACKBOARD_PATH = "blackboard/blackboard.json"
@@ -334,6 +334,8 @@ class CyberMonitorApp:
         sys.stderr = captured_out._orig_stderr
 
 if __name__ == "__main__":
+    # Agent progress is logged at INFO, step details at DEBUG (LOG_LEVEL=DEBUG)
+    setup_logging()
     root = tk.Tk()
     app = CyberMonitorApp(root)
     root.mainloop()
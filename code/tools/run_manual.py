@@ -1,3 +1,5 @@
+import os
+import signal
 import subprocess
 
 def run_clean_output(cmd, timeout=600):
@@ -25,6 +27,30 @@ def run_clean_output(cmd, timeout=600):
 
     return "\n".join(full_output)
 
+def run_output_bytes(cmd, timeout=600):
+    """
+    Run a shell command and return its raw output (stdout + stderr) as bytes,
+    so callers can filter it before paying for the decode.
+    The timeout is enforced on the whole run; on timeout the command's whole process group is killed
+    (not only the shell, whose children would otherwise keep the output pipe open).
+    """
+    process = subprocess.Popen(
+        cmd,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        raise TimeoutError(f"Command exceeded timeout of {timeout} seconds")
+
+    return stdout
+
 # [DEBUG]
 if __name__ == "__main__":
     print("🔥 run_manual.py started")
@@ -48,7 +48,7 @@ from encoders.action_encoder import ActionEncoder
 
 from tools.action_space import get_commands_for_agent
 
-from utils.utils import load_dataset, check_file_exists
+from utils.utils import load_dataset, check_file_exists, setup_logging
 
 from create_datasets.create_cve_dataset.download_combine_nvd_cve import download_nvd_cve
 from create_datasets.create_cve_dataset.create_cve_cpe_dataset import create_cve_cpe_dataset
@@ -220,6 +220,7 @@ def main():
             target=TARGET_IP
         )
         orchestrator.run_scenario_loop()
+        recon_agent.flush_experiences()
 
         # --- Track actions taken ---
         all_actions.append({
@@ -266,4 +267,6 @@ def main():
     exploit_trainer.plot_training_progress()
 
 if __name__ == "__main__":
+    # Agent progress is logged at INFO, step details at DEBUG (LOG_LEVEL=DEBUG)
+    setup_logging()
     main()
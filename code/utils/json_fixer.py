@@ -183,7 +183,7 @@ def extract_status_block(text_after_status, status_code):
 
         path = ''
         while pos < len(after_status):
-            if any(after_status[pos:].startswith(code) for code in status_codes):
+            if after_status.startswith(status_codes, pos):
                 inside_block = False
                 break
             c = after_status[pos]
@@ -200,7 +200,7 @@ def extract_status_block(text_after_status, status_code):
 
         value = ''
         while pos < len(after_status):
-            if any(after_status[pos:].startswith(code) for code in status_codes):
+            if after_status.startswith(status_codes, pos):
                 inside_block = False
                 break
             if after_status[pos] in [',', '}', '\'', '"', ':']:
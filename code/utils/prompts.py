@@ -222,6 +222,27 @@ No emojis!!
 
   return final_prompt
 
+def clean_output_prompt(command_output: str) -> str:
+  part_1 = f"""
+You are given the raw output of a reconnaissance command.
+Remove the noise: banners, progress lines, repeated separators, timing statistics and any line without technical information.
+Keep every line that contains technical details (IPs, hostnames, ports, protocols, services, versions, OS, paths, status codes, users, shares) exactly as written - do not summarize, reword or invent anything.
+
+Here is the raw output:
+"""
+  part_2 = f"""{command_output}"""
+
+  part_3 = f"""
+Return only the cleaned output, with no explanations.
+"""
+  part_1 = clean_prompt(part_1)
+  part_2 = clean_command_output(part_2)
+  part_3 = clean_prompt(part_3)
+
+  final_prompt = part_1 + part_2 + part_3
+
+  return final_prompt
+
 # [DEBUG]
 if __name__ == "__main__":
   print("""
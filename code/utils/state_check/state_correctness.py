@@ -9,7 +9,7 @@ import os
 
 from config import EXPECTED_STATUS_CODES, STATE_SCHEMA, DATASET_OS_LINUX, DATASET_OS_LINUX_KERNEL
 
-from utils.utils import run_command, load_dataset
+from utils.utils import run_command, load_dataset, clone_state
 from utils.state_check.correctness_cache import CorrectnessCache
 
 from blackboard.blackboard import initialize_blackboard
@@ -339,8 +339,13 @@ def clean_state(state: dict, structure: dict) -> dict:
     Returns:
         Cleaned state dictionary.
     """
-    cleaned = copy.deepcopy(state)
+    # Copy once here; the nested levels are cleaned in place on this copy
+    return _clean_state_in_place(clone_state(state), structure)
 
+def _clean_state_in_place(cleaned: dict, structure: dict) -> dict:
+    """
+    clean_state without the copy: cleans `cleaned` in place and returns it.
+    """
     for key, expected_value in structure.items():
         if key not in cleaned:
             continue
@@ -385,7 +390,7 @@ def clean_state(state: dict, structure: dict) -> dict:
                         if not value[subkey]:
                             value[subkey] = {"": ""}
             # Recurse into nested dicts
-            cleaned[key] = clean_state(value, expected_value)
+            cleaned[key] = _clean_state_in_place(value, expected_value)
 
     return cleaned
 
@@ -1,7 +1,6 @@
 import json
 import sys
 import os
-from copy import deepcopy
 
 from config import STATE_SCHEMA
 
@@ -86,10 +85,11 @@ def _sort_recursive(obj, prefix=""):
 
 def sort_state(state: dict) -> dict:
     """
-    Deep-copies `state`, then applies recursive sorting/deduplication
-    guided entirely by STATE_SCHEMA.
+    Applies recursive sorting/deduplication guided entirely by STATE_SCHEMA.
+    `state` is not modified: every dict and list of the result is newly built,
+    so no deep copy is needed up front.
     """
-    return _sort_recursive(deepcopy(state))
+    return _sort_recursive(state)
 
 # [DEBUG]
 if __name__ == "__main__":
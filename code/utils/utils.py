@@ -1,9 +1,12 @@
 import subprocess
 import re
+import sys
+import logging
 import json
 import os
 import orjson
 import csv
+import copy
 import shutil
 
 def get_first_word(s: str) -> str:
@@ -43,6 +46,50 @@ def get_nested(d: dict, path: str):
         d = d.get(k)
     return d
 
+_ATOMIC_TYPES = (str, int, float, bool, type(None))
+
+def clone_state(obj):
+    """
+    Deep copy for JSON-shaped data (dicts, lists and primitives), much cheaper than copy.deepcopy.
+    Any other type falls back to copy.deepcopy.
+
+    Parameters:
+        obj: The object to copy.
+
+    Returns:
+        A copy that shares no dicts / lists with `obj`.
+    """
+    t = type(obj)
+    if t is dict:
+        return {k: clone_state(v) for k, v in obj.items()}
+    if t is list:
+        return [clone_state(v) for v in obj]
+    if t in _ATOMIC_TYPES:
+        return obj
+    return copy.deepcopy(obj)
+
+
+def freeze(obj):
+    """
+    Hashable projection of JSON-shaped data, for set-based duplicate checks:
+    dicts become frozensets of (key, value) pairs, lists and tuples become tuples.
+
+    Parameters:
+        obj: The object to freeze.
+
+    Returns:
+        A hashable value; two objects that compare equal freeze to equal values.
+    """
+    t = type(obj)
+    if t is dict:
+        return frozenset((k, freeze(v)) for k, v in obj.items())
+    if t is list or t is tuple:
+        return tuple(freeze(v) for v in obj)
+    if t is set:
+        return frozenset(freeze(v) for v in obj)
+    return obj
+
+
 def remove_comments_and_empty_lines(text: str) -> str:
     """
     Removes comment lines (starting with '#') and empty lines from a multiline string.
@@ -53,12 +100,29 @@ def remove_comments_and_empty_lines(text: str) -> str:
     Returns:
         str: Cleaned text.
     """
-    cleaned_lines = []
-    for line in text.splitlines():
-        stripped = line.strip()
-        if stripped and not stripped.startswith("#"):
-            cleaned_lines.append(line)
-    return "\n".join(cleaned_lines)
+    # Single comprehension: lstrip is enough to detect blank / comment lines, and the
+    # filtering runs without per-line method calls on a result list
+    return "\n".join([
+        line for line in text.splitlines()
+        if (stripped := line.lstrip()) and stripped[0] != "#"
+    ])
+
+
+def remove_comments_and_empty_lines_bytes(data: bytes) -> str:
+    """
+    Same as remove_comments_and_empty_lines, for raw command output: lines are filtered
+    (and right-stripped) as bytes, and only the kept lines are decoded.
+
+    Parameters:
+        data (bytes): Raw multiline output.
+
+    Returns:
+        str: Cleaned text (invalid UTF-8 sequences are replaced).
+    """
+    return b"\n".join([
+        line.rstrip() for line in data.splitlines()
+        if (stripped := line.lstrip()) and stripped[:1] != b"#"
+    ]).decode("utf-8", errors="replace")
 
 # 1) ANSI CSI 
 _CSI_RE = re.compile(r'\x1b\[[0-9;]*[@-~]')
@@ -143,6 +207,25 @@ def check_file_exists(file_path, min_size_gb=None):
         
     print(f"✅ File {os.path.basename(file_path)} ({size_gb:.2f}GB) exists")
 
+class _CurrentStdout:
+    """
+    Stream that writes to whatever sys.stdout is at write time (e.g. run.py's GUI redirect).
+    """
+    def write(self, text):
+        return sys.stdout.write(text)
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+def setup_logging() -> None:
+    """
+    Configure the root logger for the entry points: plain messages on stdout (where the agents'
+    prints used to go), at INFO by default or the level in the LOG_LEVEL env var (e.g. DEBUG).
+    """
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s", stream=_CurrentStdout())
+
+
 def run_command(cmd: str) -> str:
     """
     Executes a shell command and returns its output as a string.